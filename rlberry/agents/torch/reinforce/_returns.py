@@ -0,0 +1,24 @@
+import numpy as np
+
+from rlberry.utils.jit_setup import numba_jit
+
+
+@numba_jit
+def discounted_returns(rewards, is_terminals, gamma):
+    """
+    Reverse discounted-return accumulation, resetting at terminal states.
+
+    rewards : np.ndarray
+        shape (N,), dtype float32
+    is_terminals : np.ndarray
+        shape (N,), dtype bool
+    gamma : double
+    """
+    returns = np.empty_like(rewards)
+    discounted_reward = 0.0
+    for ii in range(len(rewards) - 1, -1, -1):
+        if is_terminals[ii]:
+            discounted_reward = 0.0
+        discounted_reward = rewards[ii] + gamma * discounted_reward
+        returns[ii] = discounted_reward
+    return returns
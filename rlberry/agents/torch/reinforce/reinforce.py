@@ -1,19 +1,24 @@
-import inspect
-
 import gymnasium.spaces as spaces
 import numpy as np
 import torch
+import torch.nn.functional as F
 
 import rlberry
 from rlberry.agents import AgentTorch, AgentWithSimplePolicy
 from rlberry.agents.torch.utils.models import default_policy_net_fn
+from rlberry.agents.torch.reinforce._returns import discounted_returns
 from rlberry.agents.torch.utils.training import optimizer_factory
-from rlberry.agents.utils.memories import Memory
 from rlberry.utils.torch import choose_device
 
 logger = rlberry.logger
 
 
+@torch.jit.script
+def _reinforce_loss(logprobs, rewards, dist_entropy, entr_coef: float):
+    """Scripted so that the elementwise loss terms fuse into a single kernel."""
+    return (-logprobs * rewards - entr_coef * dist_entropy).mean()
+
+
 class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
     """
     REINFORCE with entropy regularization.
@@ -44,6 +49,9 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
     use_bonus_if_available : bool, default = False
         If true, check if environment info has entry 'exploration_bonus'
         and add it to the reward. See also UncertaintyEstimatorWrapper.
+    use_torch_compile : bool, default = False
+        If true, compile the policy network with :func:`torch.compile`
+        (requires torch>=2.0) to reduce kernel-launch overhead.
     device: str
         Device to put the tensors on
 
@@ -71,8 +79,6 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
         The policy network used by the agent.
     policy_optimizer : torch.optim.Optimizer
         The optimizer used for training the policy network.
-    memory : Memory
-        The memory buffer used to store the agent's experiences.
     episode : int
         A counter that keeps track of the number of episodes.
 
@@ -99,14 +105,19 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
         policy_net_fn=None,
         policy_net_kwargs=None,
         use_bonus_if_available=False,
+        use_torch_compile=False,
         device="cuda:best",
         **kwargs
     ):
-        # For all parameters, define self.param = param
-        _, _, _, values = inspect.getargvalues(inspect.currentframe())
-        values.pop("self")
-        for arg, val in values.items():
-            setattr(self, arg, val)
+        self.batch_size = batch_size
+        self.horizon = horizon
+        self.gamma = gamma
+        self.entr_coef = entr_coef
+        self.learning_rate = learning_rate
+        self.normalize = normalize
+        self.optimizer_type = optimizer_type
+        self.use_bonus_if_available = use_bonus_if_available
+        self.use_torch_compile = use_torch_compile
 
         AgentWithSimplePolicy.__init__(self, env, **kwargs)
 
@@ -136,11 +147,56 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
             self.device
         )
 
+        # sampling entry point: policy() and _update read the raw action
+        # scores when the network exposes them, and fall back to the
+        # distribution-returning forward otherwise
+        self._action_scores_fn = getattr(self.policy_net, "action_scores", None)
+
+        if self.use_torch_compile:
+            if hasattr(torch, "compile"):
+                # on CUDA, "reduce-overhead" captures the compiled calls in
+                # CUDA graphs. Since the action-scores entry point is compiled
+                # below as well, the per-step sampling pass used by policy()
+                # is replayed as a graph instead of launching every kernel
+                # separately
+                compile_mode = (
+                    "reduce-overhead"
+                    if str(self.device).startswith("cuda")
+                    else "default"
+                )
+                self.policy_net = torch.compile(self.policy_net, mode=compile_mode)
+                if self._action_scores_fn is not None:
+                    # plain attribute access on a compiled module is delegated
+                    # to the original module, so the action-scores entry point
+                    # must be compiled separately to actually run compiled
+                    self._action_scores_fn = torch.compile(
+                        self._action_scores_fn, mode=compile_mode
+                    )
+            else:
+                logger.warning(
+                    "use_torch_compile=True requires torch>=2.0, "
+                    "using the uncompiled policy network."
+                )
+
         self.policy_optimizer = optimizer_factory(
             self.policy_net.parameters(), **self.optimizer_kwargs
         )
 
-        self.memory = Memory()
+        # preallocated rollout buffers (structure-of-arrays layout): _update
+        # consumes each field as a contiguous array, with no per-step boxing.
+        # The states buffer keeps the full observation shape, so
+        # multi-dimensional (e.g. image) observations are stored as-is
+        max_transitions = self.batch_size * self.horizon
+        self._states_buffer = np.empty(
+            (max_transitions,) + self.env.observation_space.shape, dtype=np.float32
+        )
+        self._actions_buffer = np.empty(max_transitions, dtype=np.int64)
+        self._rewards_buffer = np.empty(max_transitions, dtype=np.float32)
+        self._is_terminals_buffer = np.empty(max_transitions, dtype=np.bool_)
+        self._memory_size = 0
+
+        # reusable noise buffer for Gumbel-max action sampling
+        self._gumbel_noise = torch.empty(self.action_dim, device=self.device)
 
         self.episode = 0
 
@@ -148,9 +204,20 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
         state = observation
         assert self.policy_net is not None
         state = torch.from_numpy(state).float().to(self.device)
-        action_dist = self.policy_net(state)
-        action = action_dist.sample().item()
-        return action
+        # no gradient is needed to sample an action, so skip autograd
+        # bookkeeping and only synchronize with the device once
+        with torch.no_grad():
+            if self._action_scores_fn is not None:
+                # Gumbel-max trick: the argmax of the scores perturbed with
+                # Gumbel noise is a sample from the categorical distribution,
+                # with no softmax and no multinomial kernel
+                action_scores = self._action_scores_fn(state)
+                self._gumbel_noise.exponential_().log_().neg_()
+                action = (action_scores + self._gumbel_noise).argmax(-1)
+            else:
+                action_dist = self.policy_net(state)
+                action = action_dist.sample()
+        return action.item()
 
     def fit(self, budget: int, **kwargs):
         """
@@ -170,28 +237,42 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
             count += 1
 
     def _run_episode(self):
+        # bind the attributes touched on every step to locals, so the loop
+        # does LOAD_FAST instead of repeated attribute lookups
+        env_step = self.env.step
+        policy = self.policy
+        states_buffer = self._states_buffer
+        actions_buffer = self._actions_buffer
+        rewards_buffer = self._rewards_buffer
+        is_terminals_buffer = self._is_terminals_buffer
+        use_bonus_if_available = self.use_bonus_if_available
+        memory_size = self._memory_size
+
         # interact for H steps
         episode_rewards = 0
         observation, info = self.env.reset()
         for _ in range(self.horizon):
-            # running policy
-            action = self.policy(observation)
-            next_observation, reward, terminated, truncated, info = self.env.step(
-                action
-            )
+            # stage the observation in the float32 states buffer before the
+            # forward pass, so the policy reads it without an extra dtype
+            # conversion. The .item() sync inside policy() is the single
+            # device round-trip of the step: the environment is sequential
+            # and consumes the action immediately, so it cannot be deferred.
+            states_buffer[memory_size] = observation
+            action = policy(states_buffer[memory_size])
+            next_observation, reward, terminated, truncated, info = env_step(action)
             done = terminated or truncated
 
             # check whether to use bonus
             bonus = 0.0
-            if self.use_bonus_if_available:
+            if use_bonus_if_available:
                 if info is not None and "exploration_bonus" in info:
                     bonus = info["exploration_bonus"]
 
-            # save in batch
-            self.memory.states.append(observation)
-            self.memory.actions.append(action)
-            self.memory.rewards.append(reward + bonus)  # add bonus here
-            self.memory.is_terminals.append(done)
+            # save in batch (the observation is already in the states buffer)
+            actions_buffer[memory_size] = action
+            rewards_buffer[memory_size] = reward + bonus  # add bonus here
+            is_terminals_buffer[memory_size] = done
+            memory_size += 1
             episode_rewards += reward
 
             if done:
@@ -200,6 +281,8 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
             # update observation
             observation = next_observation
 
+        self._memory_size = memory_size
+
         # update
         self.episode += 1
 
@@ -210,44 +293,62 @@ class REINFORCEAgent(AgentTorch, AgentWithSimplePolicy):
         #
         if self.episode % self.batch_size == 0:
             self._update()
-            self.memory.clear_memory()
+            self._memory_size = 0
 
         return episode_rewards
 
     def _normalize(self, x):
         return (x - x.mean()) / (x.std() + 1e-5)
 
+    def _to_device(self, array):
+        """
+        Build a tensor from a numpy array. On CUDA, stage the copy through
+        pinned memory so the host-to-device transfer can overlap with compute.
+        """
+        tensor = torch.from_numpy(array)
+        if str(self.device).startswith("cuda"):
+            tensor = tensor.pin_memory()
+        return tensor.to(self.device, non_blocking=True)
+
     def _update(self):
-        # monte carlo estimate of rewards
-        rewards = []
-        discounted_reward = 0
-        for reward, is_terminal in zip(
-            reversed(self.memory.rewards), reversed(self.memory.is_terminals)
-        ):
-            if is_terminal:
-                discounted_reward = 0
-            discounted_reward = reward + (self.gamma * discounted_reward)
-            rewards.insert(0, discounted_reward)
-
-        # convert list to tensor
-        states = torch.FloatTensor(np.array(self.memory.states)).to(self.device)
-        actions = torch.LongTensor(self.memory.actions).to(self.device)
-        rewards = torch.FloatTensor(rewards).to(self.device)
+        n_transitions = self._memory_size
+
+        # monte carlo estimate of rewards: single reverse pass over
+        # contiguous arrays, resetting the accumulator at terminal states
+        returns = discounted_returns(
+            self._rewards_buffer[:n_transitions],
+            self._is_terminals_buffer[:n_transitions],
+            self.gamma,
+        )
+
+        # convert to tensor; the rollout buffers are already contiguous,
+        # so the single batched forward pass below needs no extra copy
+        states = self._to_device(self._states_buffer[:n_transitions])
+        actions = self._to_device(self._actions_buffer[:n_transitions])
+        rewards = self._to_device(returns)
         if self.normalize:
             rewards = self._normalize(rewards)
 
-        # evaluate logprobs
-        action_dist = self.policy_net(states)
-        logprobs = action_dist.log_prob(actions)
-        dist_entropy = action_dist.entropy()
+        # evaluate logprobs and entropy. When the network exposes its raw
+        # action scores, derive both from a single log_softmax instead of
+        # materializing a Categorical distribution
+        if self._action_scores_fn is not None:
+            action_scores = self._action_scores_fn(states)
+            all_logprobs = F.log_softmax(action_scores, dim=-1)
+            logprobs = all_logprobs.gather(1, actions.unsqueeze(-1)).squeeze(-1)
+            dist_entropy = -(all_logprobs.exp() * all_logprobs).sum(-1)
+        else:
+            action_dist = self.policy_net(states)
+            logprobs = action_dist.log_prob(actions)
+            dist_entropy = action_dist.entropy()
 
         # compute loss
-        loss = -logprobs * rewards - self.entr_coef * dist_entropy
+        loss = _reinforce_loss(logprobs, rewards, dist_entropy, self.entr_coef)
 
         # take gradient step
         self.policy_optimizer.zero_grad()
 
-        loss.mean().backward()
+        loss.backward()
 
         self.policy_optimizer.step()
 
@@ -1,5 +1,7 @@
 from collections import deque
 
+import numpy as np
+
 import rlberry
 import rlberry.spaces as spaces
 from rlberry.envs.interface import Model
@@ -37,18 +39,32 @@ class Bandit(Model):
 
     name = ""
 
+    # number of samples drawn per arm when a pre-sample cache is empty
+    REFILL_SIZE = 1024
+
     def __init__(self, laws=[], **kwargs):
         Model.__init__(self, **kwargs)
         self.laws = laws
         self.n_arms = len(self.laws)
         self.action_space = spaces.Discrete(self.n_arms)
 
-        # Pre-sample 10 samples
+        self._presample()
+
+    def _presample(self, size=10):
+        """
+        Pre-sample `size` rewards per arm from the current rng.
+        """
         self.rewards = [
-            deque(self.laws[action].rvs(size=10, random_state=self.rng))
+            deque(self.laws[action].rvs(size=size, random_state=self.rng))
             for action in range(self.n_arms)
         ]
-        self.n_rewards = [10] * self.n_arms
+        self.n_rewards = [size] * self.n_arms
+
+    def reseed(self, seed_seq=None):
+        Model.reseed(self, seed_seq)
+        # drop rewards pre-sampled with the previous rng, so that the
+        # sequence of rewards only depends on the new seed
+        self._presample()
 
     def step(self, action):
         """
@@ -57,12 +73,53 @@ class Bandit(Model):
         # test that the action exists
         assert action < self.n_arms
 
-        reward = self.laws[action].rvs(random_state=self.rng, size=1)[0]
+        # consume the pre-sampled rewards and refill in large batches to
+        # amortize the per-call overhead of scipy's rvs
+        if not self.rewards[action]:
+            self.rewards[action].extend(
+                self.laws[action].rvs(size=self.REFILL_SIZE, random_state=self.rng)
+            )
+            self.n_rewards[action] += self.REFILL_SIZE
+        reward = self.rewards[action].popleft()
         terminated = True
         truncated = False
 
         return 0, reward, terminated, truncated, {}
 
+    def step_batch(self, action, n_steps):
+        """
+        Sample several rewards for one action without per-pull overhead.
+
+        The pre-sampled reward cache used by :meth:`step` is consumed first,
+        then the remaining rewards are drawn from the arm's law in a single
+        call to rvs.
+
+        Parameters
+        ----------
+        action : int
+            Arm to pull.
+        n_steps : int
+            Number of pulls.
+
+        Returns
+        -------
+        np.ndarray of shape (n_steps,) containing the sampled rewards.
+        """
+        # test that the action exists
+        assert action < self.n_arms
+
+        cache = self.rewards[action]
+        n_cached = min(len(cache), n_steps)
+        batch = np.empty(n_steps)
+        for ii in range(n_cached):
+            batch[ii] = cache.popleft()
+        if n_cached < n_steps:
+            batch[n_cached:] = self.laws[action].rvs(
+                size=n_steps - n_cached, random_state=self.rng
+            )
+            self.n_rewards[action] += n_steps - n_cached
+        return batch
+
     def reset(self, seed=None, option=None):
         """
         Reset the environment to a default state.
@@ -90,7 +147,10 @@ class AdversarialBandit(Model):
     def __init__(self, rewards=[], **kwargs):
         Model.__init__(self, **kwargs)
         self.n_arms = rewards.shape[1]
-        self.rewards = deque(rewards)
+        # keep the reward table contiguous and advance a cursor in step,
+        # instead of popping rows from a deque
+        self.rewards = np.ascontiguousarray(rewards)
+        self._time = 0
         self.action_space = spaces.Discrete(self.n_arms)
 
     def step(self, action):
@@ -100,8 +160,8 @@ class AdversarialBandit(Model):
         # test that the action exists
         assert action < self.n_arms
 
-        rewards = self.rewards.popleft()
-        reward = rewards[action]
+        reward = self.rewards[self._time, action]
+        self._time += 1
         terminated = True
         truncated = False
         return 0, reward, terminated, truncated, {}
@@ -15,11 +15,11 @@ def test_bernoulli():
     env = BernoulliBandit(p=[0.05, 0.95])
     safe_reseed(env, Seeder(TEST_SEED))
 
-    sample = [env.step(1)[1] for f in range(1000)]
+    sample = env.step_batch(1, 1000)
 
     safe_reseed(env, Seeder(TEST_SEED))
 
-    sample2 = [env.step(1)[1] for f in range(1000)]
+    sample2 = env.step_batch(1, 1000)
 
     assert np.abs(np.mean(sample) - 0.95) < 0.1
     assert np.mean(sample) == np.mean(sample2), "Not reproducible"
@@ -29,10 +29,10 @@ def test_normal():
     env = NormalBandit(means=[0, 1])
     safe_reseed(env, Seeder(TEST_SEED))
 
-    sample = [env.step(1)[1] for f in range(1000)]
+    sample = env.step_batch(1, 1000)
     safe_reseed(env, Seeder(TEST_SEED))
 
-    sample2 = [env.step(1)[1] for f in range(1000)]
+    sample2 = env.step_batch(1, 1000)
 
     assert np.abs(np.mean(sample) - 1) < 0.1
     assert np.abs(sample[0] - sample2[0]) < 0.01, "Not reproducible"
@@ -42,7 +42,7 @@ def test_cor_normal():
     env = CorruptedNormalBandit(means=[0, 1], cor_prop=0.1)
     safe_reseed(env, Seeder(TEST_SEED))
 
-    sample = [env.step(1)[1] for f in range(1000)]
+    sample = env.step_batch(1, 1000)
     assert np.abs(np.median(sample) - 1) < 0.5
 
 
@@ -3,9 +3,11 @@ import concurrent.futures
 import cProfile
 import functools
 import gc
+import importlib.util
 import json
 import logging
 import multiprocessing
+import os
 import pickle
 import pstats
 import shutil
@@ -29,11 +31,9 @@ from rlberry.seeding import Seeder, safe_reseed, set_external_seed
 from rlberry.utils.logging import configure_logging
 from rlberry.utils.writers import DefaultWriter
 
-_OPTUNA_INSTALLED = True
-try:
-    import optuna
-except Exception:
-    _OPTUNA_INSTALLED = False
+# check for optuna without importing it: the import itself is deferred to
+# the methods that need it, to keep `import rlberry.manager` lightweight
+_OPTUNA_INSTALLED = importlib.util.find_spec("optuna") is not None
 
 logger = rlberry.logger
 
@@ -170,12 +170,14 @@ class ExperimentManager:
     ----------
     agent_class
         Class of the agent.
-    train_env : tuple (constructor, kwargs)
-        Enviroment used to initialize/train the agent.
+    train_env : tuple (constructor, kwargs) or callable
+        Enviroment used to initialize/train the agent. A bare callable is
+        interpreted as a zero-argument environment factory; environments are
+        built lazily from the constructor inside each worker.
     fit_budget : int
         Budget used to call :meth:`rlberry.agents.agent.Agent.fit`.
         If None, must be given in ``fit_kwargs['fit_budget']``.
-    eval_env : Tuple (constructor, kwargs)
+    eval_env : Tuple (constructor, kwargs) or callable
         Environment used to evaluate the agent. If None, set to ``train_env``.
     init_kwargs : dict
         Arguments required by the agent's constructor. Shared across all n_fit instances.
@@ -294,14 +296,20 @@ class ExperimentManager:
         if agent_name is None:
             self.agent_name = agent_class.name
 
-        # Check train_env and eval_env
+        # Check train_env and eval_env: bare callables are accepted as
+        # zero-argument environment factories and normalized to the
+        # (constructor, kwargs) form
+        if callable(train_env):
+            train_env = (train_env, None)
         assert isinstance(
             train_env, Tuple
-        ), "[ExperimentManager]train_env must be Tuple (constructor, kwargs)"
+        ), "[ExperimentManager]train_env must be Tuple (constructor, kwargs) or callable"
         if eval_env is not None:
+            if callable(eval_env):
+                eval_env = (eval_env, None)
             assert isinstance(
                 eval_env, Tuple
-            ), "[ExperimentManager]train_env must be Tuple (constructor, kwargs)"
+            ), "[ExperimentManager]eval_env must be Tuple (constructor, kwargs) or callable"
 
         # check options
         assert outdir_id_style in [None, "unique", "timestamp"]
@@ -316,9 +324,10 @@ class ExperimentManager:
         # Train env
         self.train_env = train_env
 
-        # Check eval_env
+        # Check eval_env. The (constructor, kwargs) spec is treated as
+        # read-only, so it can be shared without a deepcopy.
         if eval_env is None:
-            eval_env = deepcopy(train_env)
+            eval_env = train_env
 
         self._eval_env = eval_env
 
@@ -587,6 +596,8 @@ class ExperimentManager:
     def clear_output_dir(self):
         """Delete output_dir and all its data."""
         if self.optuna_study:
+            import optuna
+
             optuna.delete_study(self.optuna_study.study_name, self.optuna_storage_url)
         try:
             shutil.rmtree(self.output_dir_)
@@ -706,9 +717,14 @@ class ExperimentManager:
             executor_class = concurrent.futures.ThreadPoolExecutor
             lock = threading.Lock()
         elif self.parallelization == "process":
+            # export before the pool is created: spawned workers then inherit
+            # the variable before numpy loads its BLAS/OpenMP runtime, which
+            # reads it at library load time
+            os.environ.setdefault("OMP_NUM_THREADS", "1")
             executor_class = functools.partial(
                 concurrent.futures.ProcessPoolExecutor,
                 mp_context=multiprocessing.get_context(self.mp_context),
+                initializer=_limit_worker_threads,
             )
             lock = multiprocessing.Manager().Lock()
         else:
@@ -723,7 +739,7 @@ class ExperimentManager:
                 self.agent_class,
                 budget,
                 init_kwargs,
-                deepcopy(self.fit_kwargs),
+                self.fit_kwargs,
                 writer,
                 self.worker_logging_level,
                 seeder,
@@ -806,20 +822,30 @@ class ExperimentManager:
         for handler in self.agent_handlers:
             handler.dump()
 
+        # The agent handlers were dumped to their own files above, so the
+        # pickle below only contains light metadata. The optuna study is
+        # likewise backed by its RDB storage: save only the study name and
+        # reconnect in load(), instead of serializing the study object.
+        dict_to_save = dict(self.__dict__)
+        optuna_study = dict_to_save.pop("optuna_study")
+        dict_to_save["_optuna_study_name"] = (
+            optuna_study.study_name if optuna_study is not None else None
+        )
+
         # save
         filename = Path("manager_obj").with_suffix(".pickle")
         filename = output_dir / filename
         filename.parent.mkdir(parents=True, exist_ok=True)
         try:
             with filename.open("wb") as ff:
-                pickle.dump(self.__dict__, ff)
+                pickle.dump(dict_to_save, ff)
             logger.info(
                 "Saved ExperimentManager({}) using pickle.".format(self.agent_name)
             )
         except Exception:
             try:
                 with filename.open("wb") as ff:
-                    dill.dump(self.__dict__, ff)
+                    dill.dump(dict_to_save, ff)
                 logger.info(
                     "Saved ExperimentManager({}) using dill.".format(self.agent_name)
                 )
@@ -872,6 +898,24 @@ class ExperimentManager:
         obj.__dict__.clear()
         obj.__dict__.update(tmp_dict)
 
+        # Reconnect the optuna study from its storage, if there was one.
+        # Old pickles stored the study object itself, in which case the
+        # entry is already in place.
+        study_name = obj.__dict__.pop("_optuna_study_name", None)
+        if "optuna_study" not in obj.__dict__:
+            obj.optuna_study = None
+        if study_name is not None and _OPTUNA_INSTALLED:
+            import optuna
+
+            try:
+                obj.optuna_study = optuna.load_study(
+                    study_name=study_name, storage=obj.optuna_storage_url
+                )
+            except Exception as ex:
+                logger.warning(
+                    f"Could not reconnect to optuna study {study_name}: {ex}"
+                )
+
         # If the agent is loaded from an agent pickle, compare versions
         if "rlberry_version" in obj.__dict__.keys():
             if rlberry.__version__ != obj.__dict__["rlberry_version"]:
@@ -959,6 +1003,10 @@ class ExperimentManager:
             Number of workers used by optuna for optimization.
         optuna_parallelization : 'thread' or 'process'
             Whether to use threads or processes for optuna parallelization.
+            With 'process', OMP_NUM_THREADS=1 is exported (unless already
+            set) before the pool is created and each worker limits its
+            intra-process threading, to avoid oversubscribing the CPU with
+            nested parallelism.
         sampler_method : str
             Optuna sampling method.
         pruner_method : str
@@ -1000,6 +1048,8 @@ class ExperimentManager:
             logging.error("Optuna not installed.")
             return
 
+        import optuna
+
         assert fit_fraction > 0.0 and fit_fraction <= 1.0
 
         #
@@ -1088,8 +1138,10 @@ class ExperimentManager:
                         )
                     executor.shutdown()
             elif optuna_parallelization == "process":
+                os.environ.setdefault("OMP_NUM_THREADS", "1")
                 with concurrent.futures.ProcessPoolExecutor(
-                    mp_context=multiprocessing.get_context(self.mp_context)
+                    mp_context=multiprocessing.get_context(self.mp_context),
+                    initializer=_limit_worker_threads,
                 ) as executor:
                     for _ in range(n_optuna_workers):
                         executor.submit(
@@ -1147,6 +1199,26 @@ class ExperimentManager:
 #
 
 
+def _limit_worker_threads():
+    """
+    Initializer for worker processes: limit intra-process threading, so that
+    several workers running in parallel do not oversubscribe the CPU.
+
+    OMP_NUM_THREADS is exported by the parent before the pool is created,
+    which covers libraries loaded by freshly spawned workers. This hook
+    covers the rest: the environment variable for libraries the worker
+    imports later (e.g. torch, while unpickling its task), and, when
+    threadpoolctl is available, thread pools that were inherited already
+    initialized (fork context).
+    """
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=1)
+
+
 def _fit_worker(args):
     """Create and fit an agent instance"""
     (
@@ -1161,6 +1233,11 @@ def _fit_worker(args):
         seeder,
     ) = args
 
+    # copy fit_kwargs in the worker: with process parallelization the copy
+    # happens off the main process, and with threads each worker still gets
+    # its own copy of the (shared) dictionary
+    fit_kwargs = deepcopy(fit_kwargs)
+
     # reseed external libraries
     set_external_seed(seeder)
 
@@ -1239,6 +1316,8 @@ def _optuna_objective(
     custom_eval_function,
     thread_shared_data,
 ):
+    import optuna
+
     kwargs = deepcopy(base_init_kwargs)
 
     # will raise exception if sample_parameters() is not
@@ -183,6 +183,64 @@ def test_experiment_manager_2():
     stats_agent2.clear_output_dir()
 
 
+@pytest.mark.xfail(sys.platform == "win32", reason="bug with windows???")
+def test_experiment_manager_reconnects_optuna_study():
+    # Define train env
+    train_env = (GridWorld, {})
+
+    # Run ExperimentManager
+    stats = ExperimentManager(
+        DummyAgent,
+        train_env,
+        fit_budget=5,
+        eval_kwargs=dict(eval_horizon=10),
+        init_kwargs={},
+        n_fit=2,
+        seed=123,
+    )
+    stats.optimize_hyperparams(n_trials=3)
+    assert stats.optuna_study is not None
+
+    # the study is not pickled with the manager: load() must reconnect it
+    # from its storage
+    fname = stats.save()
+    loaded_stats = ExperimentManager.load(fname)
+    assert loaded_stats.optuna_study is not None
+    assert loaded_stats.optuna_study.study_name == stats.optuna_study.study_name
+    assert len(loaded_stats.optuna_study.trials) == len(stats.optuna_study.trials)
+
+    # continuing the optimization on the loaded manager must reuse the
+    # reconnected study
+    loaded_stats.optimize_hyperparams(n_trials=2, continue_previous=True)
+    assert loaded_stats.optuna_study.study_name == stats.optuna_study.study_name
+
+    stats.clear_output_dir()
+
+
+def test_experiment_manager_env_factory():
+    # bare callables must be accepted as zero-argument environment factories
+    # and normalized to the (constructor, kwargs) form
+    stats = ExperimentManager(
+        DummyAgent,
+        train_env=GridWorld,
+        eval_env=lambda: GridWorld(),
+        fit_budget=5,
+        eval_kwargs=dict(eval_horizon=10),
+        n_fit=2,
+        seed=123,
+    )
+    assert stats.train_env == (GridWorld, None)
+
+    stats.fit()
+    for agent in stats.agent_handlers:
+        assert agent.fitted
+
+    # evaluation builds its env from the factory as well
+    evaluate_agents([stats], show=False)
+
+    stats.clear_output_dir()
+
+
 @pytest.mark.parametrize("train_env", [(GridWorld, None), (None, None)])
 def test_experiment_manager_partial_fit_and_tuple_env(train_env):
     # Define train and evaluation envs